@@ -21,26 +21,68 @@ Structure:
 
 import os
 import argparse
-import gradio as gr
+import hashlib
+import importlib.util
+import itertools
+import re
+import shutil
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, wraps
+from multiprocessing import shared_memory
 from pathlib import Path
 import time
 import numpy as np
-import soundfile as sf
-import librosa
 import socket
+import sys
 import tempfile
 from dotenv import load_dotenv
 
+# Heavy libraries (madmom, numba, librosa, gradio) are imported on first use so that
+# CLI startup (--help, port checks) does not load the ML stack.
+
 # === EXAMPLE: Madmom-specific imports (replace with your library) ===
-try:
-    from madmom.features.downbeats import DBNDownBeatTrackingProcessor, RNNDownBeatProcessor
-    from madmom.features.onsets import OnsetPeakPickingProcessor, RNNOnsetProcessor
-    from madmom.features.beats import RNNBeatProcessor
-    from madmom.features.tempo import TempoEstimationProcessor
-    MADMOM_AVAILABLE = True
-except ImportError:
-    MADMOM_AVAILABLE = False
-    print("⚠️ Madmom not available. Install with: uv add madmom")
+MADMOM_AVAILABLE = None  # Unknown until the first analysis calls load_madmom()
+_MADMOM_LOCK = threading.Lock()
+
+def load_madmom():
+    """
+    Import madmom and build the shared processors on first use.
+
+    Processors load their RNN weights on construction, so they are built once and
+    reused (they keep no state between calls).
+
+    Returns:
+        True if madmom is available
+    """
+    global MADMOM_AVAILABLE, _DBN_DOWNBEAT, _ONSET_PEAKS, _TEMPO
+
+    if MADMOM_AVAILABLE is not None:
+        return MADMOM_AVAILABLE
+
+    # Concurrent first requests must not import and build the processors twice
+    with _MADMOM_LOCK:
+        if MADMOM_AVAILABLE is None:
+            try:
+                from madmom.features.downbeats import DBNDownBeatTrackingProcessor
+                from madmom.features.onsets import OnsetPeakPickingProcessor
+                from madmom.features.tempo import TempoEstimationProcessor
+            except ImportError:
+                MADMOM_AVAILABLE = False
+                print("⚠️ Madmom not available. Install with: uv add madmom")
+                return False
+
+            # The RNN processors run in worker processes (see run_rnn_processor)
+            _DBN_DOWNBEAT = DBNDownBeatTrackingProcessor(beats_per_bar=[3, 4], fps=100)
+            _ONSET_PEAKS = OnsetPeakPickingProcessor(threshold=0.5, fps=100)
+            _TEMPO = TempoEstimationProcessor(fps=100)
+            MADMOM_AVAILABLE = True
+
+    return MADMOM_AVAILABLE
 
 # === CONFIGURATION ===
 load_dotenv()
@@ -51,6 +93,34 @@ TEMP_DIR = Path(os.getenv('TEMP_DIR', 'outputs/demo_analysis')).resolve()
 
 # Audio configuration
 AUDIO_EXTENSIONS = {'.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac'}
+LARGE_FILE_BYTES = 50 * 1024 * 1024  # Read files above this size into a preallocated buffer
+MADMOM_SAMPLE_RATE = 44100  # madmom's RNN processors expect 44.1 kHz mono input
+# Generated audio goes to the browser from memory;
+# set PERSIST_OUTPUTS to also keep copies in TEMP_DIR
+PERSIST_OUTPUTS = os.getenv('PERSIST_OUTPUTS', 'false').lower() in ('1', 'true', 'yes')
+# Container for persisted 16-bit audio: 'wav' or 'flac' (lossless, about half the size)
+OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'wav').lower()
+if OUTPUT_FORMAT not in ('wav', 'flac'):
+    print(f"⚠️ Unsupported OUTPUT_FORMAT '{OUTPUT_FORMAT}', using wav")
+    OUTPUT_FORMAT = 'wav'
+
+# yt-dlp download tuning shared by single and batch downloads: parallel DASH
+# fragments and 10 MiB HTTP chunks (YouTube throttles small per-connection reads)
+YTDLP_DOWNLOAD_OPTS = {
+    'concurrent_fragment_downloads': 4,
+    'http_chunk_size': 10 * 1024 * 1024,
+    'retries': 3,
+    'fragment_retries': 3,
+    'buffersize': 64 * 1024,  # Download buffer (default 1 KiB)
+}
+if shutil.which('aria2c'):
+    YTDLP_DOWNLOAD_OPTS['external_downloader'] = 'aria2c'
+    YTDLP_DOWNLOAD_OPTS['external_downloader_args'] = ['-x', '4', '-s', '4', '-k', '1M']
+
+# Background pool for persisted output writes
+IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="io")
+# Background pool driving ffmpeg encodes of batch YouTube downloads
+ENCODE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="encode")
 
 # Ensure directories exist
 SAMPLES_DIR.mkdir(parents=True, exist_ok=True)
@@ -65,46 +135,85 @@ Comprehensive music information retrieval using madmom.
 Replace this with your own audio processing library!
 """
 
+# Contents of the collapsible Help section
+HELP_TEXT = """
+**Features:**
+- 🥁 **Beat Tracking:** Detects beats/downbeats and estimates BPM
+- 🎯 **Onset Detection:** Identifies note onset events
+- ⏱️ **Tempo Estimation:** Estimates primary tempo
+
+**Supported:** WAV, MP3, FLAC, OGG, M4A, AAC
+**Temp files:** Check $TEMP_DIR in .env
+"""
+
 # Custom CSS (optional)
 CUSTOM_CSS = ""
 
 # === UI HELPERS ===
 
+# Filename keyword -> emoji (the earliest keyword in the filename wins)
+SAMPLE_EMOJIS = {
+    'guitar': '🎸', 'bass': '🎸', 'drum': '🥁', 'beat': '🥁',
+    'piano': '🎹', 'keyboard': '🎹', 'vocal': '🎤', 'voice': '🎤',
+}
+_SAMPLE_EMOJI_RE = re.compile('|'.join(SAMPLE_EMOJIS))
+
+@lru_cache(maxsize=1)
+def _scan_samples(samples_dir, mtime_ns):
+    """
+    Scan a samples directory once per directory modification time.
+
+    The mtime_ns argument is only part of the cache key: adding, removing or
+    renaming a file updates the directory mtime and forces a rescan. Only the
+    latest scan is kept, since an older mtime never comes back.
+
+    Returns:
+        Tuple of sample metadata dicts, sorted by name
+    """
+    print(f"📁 Scanning samples directory: {samples_dir}")
+    samples = []
+    # scandir entries carry the file type from the directory listing (no per-file stat)
+    with os.scandir(samples_dir) as entries:
+        audio_files = [Path(entry.path) for entry in entries if entry.is_file()]
+
+    for audio_file in audio_files:
+        if audio_file.suffix.lower() in AUDIO_EXTENSIONS:
+            # Create friendly name
+            friendly_name = audio_file.stem.replace('_', ' ').replace('-', ' - ')
+
+            # Assign emoji based on filename
+            filename_lower = friendly_name.lower()
+            match = _SAMPLE_EMOJI_RE.search(filename_lower)
+            emoji = SAMPLE_EMOJIS[match.group()] if match else '🎵'
+
+            samples.append({
+                'name': friendly_name,
+                'path': str(audio_file),
+                'emoji': emoji,
+                'filename': audio_file.name
+            })
+
+    # Sort alphabetically
+    samples.sort(key=lambda x: x['name'])
+    return tuple(samples)
+
 def get_audio_samples():
     """
     Dynamically discover audio samples from the configured directory.
 
+    Results are cached until the directory changes.
+
     Returns:
         List of dicts with sample metadata (name, path, emoji, filename)
     """
-    samples = []
-
-    if SAMPLES_DIR.exists():
-        print(f"📁 Scanning samples directory: {SAMPLES_DIR}")
-        for audio_file in SAMPLES_DIR.iterdir():
-            if audio_file.is_file() and audio_file.suffix.lower() in AUDIO_EXTENSIONS:
-                # Create friendly name
-                friendly_name = audio_file.stem.replace('_', ' ').replace('-', ' - ')
-
-                # Assign emoji based on filename
-                filename_lower = friendly_name.lower()
-                emoji_map = {'guitar': '🎸', 'drum': '🥁', 'beat': '🥁', 'piano': '🎹',
-                            'keyboard': '🎹', 'vocal': '🎤', 'voice': '🎤', 'bass': '🎸'}
-                emoji = next((v for k, v in emoji_map.items() if k in filename_lower), '🎵')
-
-                samples.append({
-                    'name': friendly_name,
-                    'path': str(audio_file),
-                    'emoji': emoji,
-                    'filename': audio_file.name
-                })
-    else:
+    if not SAMPLES_DIR.exists():
         print(f"⚠️ Samples directory not found: {SAMPLES_DIR}")
         print(f"💡 Create it with: mkdir -p {SAMPLES_DIR}")
+        return []
 
-    # Sort alphabetically
-    samples.sort(key=lambda x: x['name'])
-    return samples
+    samples = _scan_samples(str(SAMPLES_DIR), SAMPLES_DIR.stat().st_mtime_ns)
+    # Return copies: callers attach UI state (e.g. buttons) to the dicts
+    return [dict(sample) for sample in samples]
 
 def load_sample_audio(sample_path):
     """Load a sample audio file path for the audio input component."""
@@ -113,6 +222,19 @@ def load_sample_audio(sample_path):
         return str(Path(sample_path).resolve())
     return None
 
+_FILE_COUNTER = itertools.count()
+# Fixed per process; the start time keeps names unique when a restarted server reuses the PID
+_FILE_PREFIX = f"{os.getpid()}_{int(time.time()):x}"
+
+def unique_suffix():
+    """
+    Collision-free suffix for generated file names.
+
+    Unlike int(time.time()), two requests in the same second never share a name,
+    and each call is only a counter increment (no clock read).
+    """
+    return f"{_FILE_PREFIX}_{next(_FILE_COUNTER)}"
+
 # === YOUTUBE DOWNLOAD ===
 
 def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality="128"):
@@ -130,6 +252,11 @@ def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality=
     if not youtube_url or youtube_url.strip() == "":
         return None, "❌ Please enter a YouTube URL first."
 
+    # Several URLs (one per line): download them as a batch
+    urls = youtube_url.split()
+    if len(urls) > 1:
+        return download_youtube_batch_summary(urls, audio_format, audio_quality)
+
     try:
         import yt_dlp
 
@@ -138,8 +265,8 @@ def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality=
         output_folder.mkdir(parents=True, exist_ok=True)
 
         # Configure output path
-        timestamp = int(time.time())
-        output_template = str(output_folder / f"youtube_audio_{timestamp}.%(ext)s")
+        suffix = unique_suffix()
+        output_template = str(output_folder / f"youtube_audio_{suffix}.%(ext)s")
 
         # yt-dlp options
         ydl_opts = {
@@ -148,6 +275,7 @@ def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality=
             'quiet': True,
             'no_warnings': True,
             'extract_audio': True,
+            **YTDLP_DOWNLOAD_OPTS,
         }
 
         # Format-specific postprocessing
@@ -170,7 +298,7 @@ def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality=
             duration = info.get('duration', 0)
 
         # Find downloaded file
-        expected_path = output_folder / f"youtube_audio_{timestamp}.{audio_format}"
+        expected_path = output_folder / f"youtube_audio_{suffix}.{audio_format}"
 
         if expected_path.exists():
             result_text = f"""
@@ -198,17 +326,676 @@ def download_youtube_audio_ytdlp(youtube_url, audio_format="wav", audio_quality=
     except Exception as e:
         return None, f"# ❌ Error\n\n**Download failed:** `{str(e)}`"
 
+def encode_audio(src_path, dst_path, audio_format="wav", audio_quality="128"):
+    """
+    Convert a downloaded audio stream with ffmpeg and delete the source file.
+
+    The source file is removed whether or not the conversion succeeds; ffmpeg's stderr
+    is raised as a RuntimeError on failure.
+
+    Returns:
+        Path of the encoded file
+    """
+    if audio_format == "mp3":
+        codec_args = ['-c:a', 'libmp3lame', '-b:a', f'{audio_quality}k']
+    else:
+        codec_args = ['-c:a', 'pcm_s16le']
+
+    try:
+        subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-i', str(src_path), '-vn', *codec_args,
+             str(dst_path)],
+            check=True, capture_output=True
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(e.stderr.decode(errors='replace').strip() or str(e)) from e
+    finally:
+        Path(src_path).unlink(missing_ok=True)
+    return Path(dst_path)
+
+def download_youtube_batch(youtube_urls, audio_format="wav", audio_quality="128"):
+    """
+    Download several YouTube URLs, encoding each one while the next downloads.
+
+    yt-dlp only fetches the raw audio stream; conversion runs in a separate ffmpeg
+    process on ENCODE_POOL, so network time and encode time overlap.
+
+    Args:
+        youtube_urls: List of YouTube video URLs
+        audio_format: Output format ('wav' or 'mp3')
+        audio_quality: Quality in kbps for lossy formats
+
+    Returns:
+        List of (url, title, future) tuples; each future resolves to the encoded path
+    """
+    import yt_dlp
+
+    output_folder = TEMP_DIR / "youtube_downloads"
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    suffix = unique_suffix()
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': str(output_folder / f"youtube_audio_{suffix}_%(id)s.%(ext)s"),
+        'quiet': True,
+        'no_warnings': True,
+        **YTDLP_DOWNLOAD_OPTS,
+    }
+
+    jobs = []
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        for url in youtube_urls:
+            try:
+                info = ydl.extract_info(url, download=True)
+            except Exception as e:
+                # Keep going: one bad URL should not cancel the rest of the batch
+                failed = Future()
+                failed.set_exception(e)
+                jobs.append((url, url, failed))
+                continue
+
+            src_path = Path(ydl.prepare_filename(info))
+            dst_path = src_path.with_name(f"{src_path.stem}.{audio_format}")
+            future = ENCODE_POOL.submit(encode_audio, src_path, dst_path,
+                                        audio_format, audio_quality)
+            jobs.append((url, info.get('title', 'Unknown'), future))
+
+    return jobs
+
+def download_youtube_batch_summary(youtube_urls, audio_format="wav", audio_quality="128"):
+    """
+    Download a batch of URLs and summarize the results for the UI.
+
+    Returns:
+        Tuple of (first_audio_path, result_message)
+    """
+    try:
+        jobs = download_youtube_batch(youtube_urls, audio_format, audio_quality)
+    except ImportError:
+        return None, ("# ❌ Error\n\n**yt-dlp not available.**\n\n"
+                      "Install with: `uv add yt-dlp` or `pip install yt-dlp`")
+    except Exception as e:
+        return None, f"# ❌ Error\n\n**Download failed:** `{str(e)}`"
+
+    paths = []
+    lines = []
+    for url, title, future in jobs:
+        try:
+            path = future.result()
+            paths.append(str(path))
+            lines.append(f"- ✅ `{title}` → `{path.name}`")
+        except Exception as e:
+            lines.append(f"- ❌ `{url}`: `{e}`")
+
+    if paths:
+        footer = ("✅ **First download loaded for analysis.** "
+                  f"All files are in `{TEMP_DIR / 'youtube_downloads'}`.")
+    else:
+        footer = "❌ **No downloads succeeded.**"
+
+    result_text = f"""
+# 📥 YouTube Batch Download
+
+## 🎵 Downloads ({len(paths)}/{len(jobs)})
+{chr(10).join(lines)}
+
+---
+{footer}
+    """
+    return (paths[0] if paths else None), result_text
+
+def stream_youtube_audio(youtube_url):
+    """
+    Decode a YouTube video's audio straight into memory, without writing any file.
+
+    yt-dlp writes the best audio stream to stdout and ffmpeg decodes it from the pipe
+    to mono 16-bit PCM at MADMOM_SAMPLE_RATE, the format the analysis works on.
+
+    Args:
+        youtube_url: YouTube video URL
+
+    Returns:
+        Mono int16 audio array sampled at MADMOM_SAMPLE_RATE
+    """
+    # yt-dlp's stderr goes to a file: a pipe nobody reads until ffmpeg finishes
+    # would fill up on retries/errors and block both processes
+    with tempfile.TemporaryFile() as ytdlp_log, subprocess.Popen(
+        [sys.executable, '-m', 'yt_dlp', '-f', 'bestaudio/best', '-o', '-',
+         '--quiet', '--no-warnings', youtube_url],
+        stdout=subprocess.PIPE, stderr=ytdlp_log
+    ) as ytdlp:
+        try:
+            ffmpeg = subprocess.Popen(
+                ['ffmpeg', '-loglevel', 'error', '-i', 'pipe:0', '-vn', '-f', 's16le',
+                 '-ac', '1', '-ar', str(MADMOM_SAMPLE_RATE), 'pipe:1'],
+                stdin=ytdlp.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError:
+            ytdlp.kill()
+            raise
+        ytdlp.stdout.close()  # ffmpeg owns the pipe now; yt-dlp gets SIGPIPE if ffmpeg exits
+        pcm, ffmpeg_err = ffmpeg.communicate()
+        ytdlp.wait()
+        ytdlp_log.seek(0)
+        ytdlp_err = ytdlp_log.read()
+
+    ytdlp_msg = ytdlp_err.decode(errors='replace').strip()
+    # When ffmpeg fails first it closes the pipe and yt-dlp dies of SIGPIPE/BrokenPipeError;
+    # report ffmpeg's error then, and yt-dlp's only when it failed on its own (starving ffmpeg)
+    ytdlp_broken_pipe = ytdlp.returncode < 0 or 'Broken pipe' in ytdlp_msg
+    if ffmpeg.returncode != 0 and (ytdlp.returncode == 0 or ytdlp_broken_pipe):
+        raise RuntimeError(ffmpeg_err.decode(errors='replace').strip() or "ffmpeg failed")
+    if ytdlp.returncode != 0:
+        raise RuntimeError(ytdlp_msg or "yt-dlp failed")
+    return np.frombuffer(pcm, dtype='<i2')
+
 # === CORE ANALYSIS (REPLACE WITH YOUR PROCESSING) ===
 
-def analyze_audio(audio_file, analysis_options):
+# RNN processors by name -> (module, class). These dominate analysis time and are
+# single-threaded, so each one runs in its own worker process.
+RNN_PROCESSORS = {
+    'downbeat': ('madmom.features.downbeats', 'RNNDownBeatProcessor'),
+    'onset': ('madmom.features.onsets', 'RNNOnsetProcessor'),
+    'beat': ('madmom.features.beats', 'RNNBeatProcessor'),
+}
+
+RNN_WORKERS = min(len(RNN_PROCESSORS), os.cpu_count() or 1)
+
+_RNN_POOL = None
+_RNN_POOL_LOCK = threading.Lock()
+
+def get_rnn_pool():
+    """Create the worker process pool on first use (one worker per RNN processor)."""
+    global _RNN_POOL
+    with _RNN_POOL_LOCK:
+        if _RNN_POOL is None:
+            # spawn: forking a process that already runs server threads is unsafe
+            _RNN_POOL = ProcessPoolExecutor(
+                max_workers=RNN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_rnn_worker
+            )
+    return _RNN_POOL
+
+def reset_rnn_pool(broken_pool):
+    """Drop a pool whose worker died so the next get_rnn_pool() call builds a new one."""
+    global _RNN_POOL
+    with _RNN_POOL_LOCK:
+        if _RNN_POOL is broken_pool:
+            _RNN_POOL = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+@lru_cache(maxsize=None)
+def get_rnn_processor(name):
+    """Build an RNN processor once per process (construction loads its weights)."""
+    module, cls = RNN_PROCESSORS[name]
+    return getattr(importlib.import_module(module), cls)()
+
+def init_rnn_worker():
+    """Pool initializer: load every RNN processor when a worker starts, not per request."""
+    for name in RNN_PROCESSORS:
+        get_rnn_processor(name)
+
+def warm_up_rnn_pool():
+    """Start all RNN workers in the background so the first analysis skips model loading."""
+    pool = get_rnn_pool()
+    for _ in range(RNN_WORKERS):
+        pool.submit(os.getpid)
+
+def run_rnn_processor(name, shm_name, shape, dtype):
+    """
+    Worker entry point: run an RNN processor on audio held in shared memory.
+
+    Args:
+        name: Key into RNN_PROCESSORS
+        shm_name, shape, dtype: Shared array handle from shared_array()
+
+    Returns:
+        Activation array
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        act = np.array(get_rnn_processor(name)(audio))
+        del audio  # Release the buffer view before closing
+        return act
+    finally:
+        shm.close()
+
+@contextmanager
+def shared_array(array):
+    """
+    Copy an array into shared memory for worker processes (avoids pickling it).
+
+    Yields:
+        (shm_name, shape, dtype) handle accepted by run_rnn_processor
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        yield shm.name, array.shape, array.dtype.str
+    finally:
+        shm.close()
+        shm.unlink()
+
+def activation_source_key(audio_file, mtime_ns):
+    """Identify a file's contents for the activation cache: resolved path + mtime."""
+    return f"{Path(audio_file).resolve()}|{mtime_ns}"
+
+def activation_cache_path(name, source_key):
+    """Cache file of one RNN processor's activations for an audio source."""
+    key = f"{source_key}|{RNN_PROCESSORS[name][1]}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return TEMP_DIR / "act_cache" / f"{digest}.npy"
+
+def cached_activation(name, madmom_input, source_key):
+    """
+    Run a madmom RNN processor, reusing activations cached on disk.
+
+    Activations are keyed by the audio source (see activation_source_key) and the
+    processor name, so re-analyzing an unchanged file skips the neural network.
+    Cache misses run on the RNN worker pool.
+
+    Args:
+        name: RNN processor name (key into RNN_PROCESSORS)
+        madmom_input: Shared array handle of the madmom input (see shared_array), or
+            None when the activation is known to be cached (a miss then raises RuntimeError)
+        source_key: Identifier of the audio the samples were loaded from
+
+    Returns:
+        Activation array produced by the processor
+    """
+    cache_path = activation_cache_path(name, source_key)
+    try:
+        return np.load(cache_path)
+    except FileNotFoundError:
+        pass
+
+    if madmom_input is None:
+        # analyze_audio skipped building the input because every activation was cached
+        raise RuntimeError(f"Cached '{name}' activation was removed during analysis; "
+                           "please run the analysis again")
+
+    pool = get_rnn_pool()
+    try:
+        act = pool.submit(run_rnn_processor, name, *madmom_input).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); replace the pool and retry once
+        print("⚠️ RNN worker pool broke, restarting it...")
+        reset_rnn_pool(pool)
+        act = get_rnn_pool().submit(run_rnn_processor, name, *madmom_input).result()
+
+    # Write to a temporary file first so a concurrent reader never sees a partial array
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # mkstemp gives each writer its own file, even threads of the same process
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, act)
+    os.replace(tmp_path, cache_path)
+    return act
+
+_KERNEL_LOCK = threading.Lock()
+
+prange = range  # Rebound to numba.prange before the first kernel is compiled
+
+def njit(**options):
+    """
+    Lazy numba.njit: numba is imported and the kernel compiled on its first call.
+    """
+    def decorator(func):
+        compiled = None
+
+        @wraps(func)
+        def wrapper(*args):
+            nonlocal compiled
+            if compiled is None:
+                global prange
+                import numba
+                prange = numba.prange
+                compiled = numba.njit(**options)(func)
+            return compiled(*args)
+        return wrapper
+    return decorator
+
+@njit(parallel=True, fastmath=True, cache=True)
+def abs_max(x):
+    """Peak absolute value of a contiguous integer array in a single pass (no abs() temporary)."""
+    flat = x.reshape(-1)
+    peak = 0
+    for i in prange(flat.size):
+        peak = max(peak, abs(np.int64(flat[i])))
+    return peak
+
+STAMP_BLOCK = 65536  # Output samples per parallel stamping block
+
+@njit(parallel=True, fastmath=True, cache=True)
+def stamp_clicks(out, positions, click):
+    """
+    Add a click template into a 2-D (samples, channels) buffer at every sample position.
+
+    Events may overlap (e.g. downbeats fall on beats), so threads split the output
+    into disjoint blocks rather than splitting the events; positions must be sorted.
+    """
+    n, channels = out.shape
+    width = click.size
+    for b in prange((n + STAMP_BLOCK - 1) // STAMP_BLOCK):
+        lo = b * STAMP_BLOCK
+        hi = min(lo + STAMP_BLOCK, n)
+        # First event whose click can still reach this block
+        k = np.searchsorted(positions, lo - width + 1)
+        while k < positions.size and positions[k] < hi:
+            start = positions[k]
+            for i in range(max(start, lo), min(start + width, hi)):
+                value = click[i - start]
+                for c in range(channels):
+                    out[i, c] += value
+            k += 1
+
+@njit(parallel=True, fastmath=True, cache=True)
+def scale_to_int16(acc, factor, out):
+    """Write round(acc * factor) from a 2-D int32 accumulator into a 2-D int16 buffer."""
+    n, channels = acc.shape
+    for i in prange(n):
+        for c in range(channels):
+            out[i, c] = np.int16(round(acc[i, c] * factor))
+
+@lru_cache(maxsize=32)
+def click_template(click_freq, click_duration, sr, gain):
+    """Hann-windowed sine click as int16 PCM with the gain applied, built once per parameter set."""
+    length = int(click_duration * sr)
+    click = gain * np.sin(2 * np.pi * click_freq * np.arange(length) / sr) * np.hanning(length)
+    click = np.round(click * 32767).astype(np.int16)
+    click.flags.writeable = False  # Shared between requests
+    return click
+
+def render_click_mix(audio, sr, click_sets, out=None, gain=0.3):
+    """
+    Overlay click tracks on 16-bit audio and normalize the mix to a 0.8 peak.
+
+    Clicks are summed in an int32 accumulator, so the mix never leaves integer PCM
+    and needs no float conversion before it is played or written.
+
+    Args:
+        audio: Mono (samples,) or multi-channel (samples, channels) int16 audio
+        sr: Sample rate in Hz
+        click_sets: Iterable of (event_times, click_freq, click_duration) tuples
+        out: Optional preallocated int32 accumulator shaped like audio (mixed in place)
+        gain: Click amplitude relative to full scale
+
+    Returns:
+        Mixed int16 audio with the same shape as the input
+    """
+    if out is None:
+        out = np.empty(audio.shape, dtype=np.int32)
+    audio_2d = audio.reshape(len(audio), -1)
+    acc_2d = out.reshape(len(out), -1)
+    mixed = np.empty(audio.shape, dtype=np.int16)
+
+    np.copyto(acc_2d, audio_2d)
+
+    # Numba's default threading layer does not allow concurrent parallel kernels
+    with _KERNEL_LOCK:
+        for times, click_freq, click_duration in click_sets:
+            # Convert event times to sorted sample indices once so the kernel can block by output
+            positions = np.sort((np.asarray(times) * sr).astype(np.int64))
+            stamp_clicks(acc_2d, positions, click_template(click_freq, click_duration, sr, gain))
+        peak = abs_max(acc_2d)
+        scale_to_int16(acc_2d, 0.8 * 32767 / peak if peak > 0 else 1.0,
+                       mixed.reshape(len(mixed), -1))
+    return mixed
+
+def warm_up_kernels():
+    """Compile (or load from cache) the click-mix kernels before the first request."""
+    render_click_mix(np.zeros(STAMP_BLOCK, dtype=np.int16), MADMOM_SAMPLE_RATE,
+                     [(np.array([0.0]), 800, 0.1)])
+
+# EXAMPLE 1: Beat Tracking
+def run_beat_tracking(audio, sr, madmom_input, source_key, mix_buf):
+    """Track beats/downbeats and render them as a click track over the audio."""
+    print("🥁 Running beat tracking...")
+    act = cached_activation('downbeat', madmom_input, source_key)
+    beat_result = _DBN_DOWNBEAT(act)
+
+    beats = beat_result[:, 0].astype(np.float64, copy=False)
+    downbeats = beat_result[beat_result[:, 1] == 1, 0]
+
+    # One inter-beat interval array feeds both the BPM and its spread
+    if beats.size > 1:
+        ibi = np.diff(beats)
+        mean_ibi = ibi.mean()
+        bpm = 60.0 / mean_ibi if mean_ibi > 0 else 0.0
+        ibi_std = float(ibi.std())
+    else:
+        bpm = 0.0
+        ibi_std = 0.0
+
+    result = {
+        'beats': beats,
+        'downbeats': downbeats,
+        'bpm': bpm,
+        'ibi_std': ibi_std,
+        'total_beats': len(beats),
+        'total_downbeats': len(downbeats)
+    }
+
+    # Mix audio + beat/downbeat clicks
+    mixed_audio = render_click_mix(audio, sr, [
+        (beats, 800, 0.1),
+        (downbeats, 1200, 0.15),
+    ], out=mix_buf)
+    return 'beats', result, mixed_audio
+
+# EXAMPLE 2: Onset Detection
+def run_onset_detection(audio, sr, madmom_input, source_key, mix_buf):
+    """Detect note onsets and render them as a click track over the audio."""
+    print("🎯 Running onset detection...")
+    onset_act = cached_activation('onset', madmom_input, source_key)
+    onsets = _ONSET_PEAKS(onset_act)
+
+    result = {
+        'onset_times': onsets,
+        'total_onsets': len(onsets),
+    }
+
+    # Mix audio + onset clicks
+    mixed_onset = render_click_mix(audio, sr, [(onsets, 1500, 0.08)], out=mix_buf)
+    return 'onsets', result, mixed_onset
+
+# EXAMPLE 3: Tempo Estimation
+def run_tempo_estimation(audio, sr, madmom_input, source_key, mix_buf):
+    """Estimate the primary tempo (no audio output)."""
+    print("⏱️ Running tempo estimation...")
+    beat_proc = cached_activation('beat', madmom_input, source_key)
+    tempo_result = _TEMPO(beat_proc)
+
+    if len(tempo_result) > 0:
+        primary_tempo = tempo_result[0][0] if isinstance(tempo_result[0], (list, tuple, np.ndarray)) else tempo_result[0]
+        result = {
+            'primary_tempo': float(primary_tempo),
+        }
+    else:
+        result = {'primary_tempo': 0.0}
+    return 'tempo', result, None
+
+# Analysis options shown in the UI, mapped to the task implementing each one.
+# Each task takes (audio, sr, madmom_input, source_key, mix_buf) and returns
+# (key, result_dict, mixed_audio_or_None); mixed audio is returned to the UI as 16-bit PCM
+# and, with PERSIST_OUTPUTS, saved as {key}_<suffix>.<OUTPUT_FORMAT>.
+ANALYSIS_TASKS = {
+    "Beat Tracking": run_beat_tracking,
+    "Onset Detection": run_onset_detection,
+    "Tempo Estimation": run_tempo_estimation,
+}
+
+# Options whose task renders a click track and therefore needs a mix buffer
+CLICK_TRACK_OPTIONS = {"Beat Tracking", "Onset Detection"}
+
+# RNN activation (key into RNN_PROCESSORS) each option's task reads
+ANALYSIS_ACTIVATIONS = {
+    "Beat Tracking": 'downbeat',
+    "Onset Detection": 'onset',
+    "Tempo Estimation": 'beat',
+}
+
+def prepare_madmom_input(audio, sr):
+    """
+    Downmix to mono and resample to MADMOM_SAMPLE_RATE once for all RNN processors.
+
+    madmom treats raw arrays as 44.1 kHz and remixes them on every call, so doing
+    this up front avoids repeated work and keeps other sample rates correct.
+    int16 input is rescaled to the [-1, 1] range of soundfile's float decoding.
+    """
+    scale = 1 / 32768 if audio.dtype == np.int16 else 1.0
+    if audio.ndim == 2 and audio.shape[1] == 2:
+        # Single fused add + scale instead of mean's sum-then-divide
+        audio_madmom = np.add(audio[:, 0], audio[:, 1], dtype=np.float32)
+        audio_madmom *= 0.5 * scale
+    elif audio.ndim == 2:
+        audio_madmom = audio.mean(axis=1, dtype=np.float32)
+        audio_madmom *= scale
+    elif scale != 1.0:
+        audio_madmom = np.multiply(audio, scale, dtype=np.float32)
+    else:
+        audio_madmom = audio.astype(np.float32, copy=False)
+
+    if sr != MADMOM_SAMPLE_RATE:
+        # Imported on demand: librosa's import graph is large and only needed here
+        import librosa
+        audio_madmom = librosa.resample(audio_madmom, orig_sr=sr,
+                                        target_sr=MADMOM_SAMPLE_RATE, res_type='soxr_hq')
+
+    # madmom coerces input to C-contiguous float32; match it so no processor copies again
+    audio_madmom = np.ascontiguousarray(audio_madmom, dtype=np.float32)
+    assert audio_madmom.flags['C_CONTIGUOUS'] and audio_madmom.dtype == np.float32
+    return audio_madmom
+
+def to_pcm16(audio):
+    """
+    Convert float audio in [-1, 1] to 16-bit PCM samples (half the size of float32).
+
+    Used by load_audio for float-encoded files; also the helper to use for custom
+    float outputs returned to Gradio (see CUSTOMIZATION_GUIDE.md).
+    """
+    # Scale and clip in one scratch buffer instead of a new temporary per operation
+    scaled = np.multiply(audio, 32767, dtype=np.float32)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return scaled.astype(np.int16)
+
+def save_pcm16(path, pcm, sr):
+    """Write int16 samples (e.g. a render_click_mix result) as 16-bit PCM in OUTPUT_FORMAT."""
+    import soundfile as sf
+
+    # 64 KiB buffered file so libsndfile's small header/frame writes are coalesced
+    with open(path, 'wb', buffering=64 * 1024) as f:
+        sf.write(f, pcm, sr, format=OUTPUT_FORMAT.upper(), subtype='PCM_16')
+
+def report_write_error(future):
+    """Log a failed background output write (nobody waits on those futures)."""
+    if future.exception() is not None:
+        print(f"⚠️ Failed to save output: {future.exception()}")
+
+@lru_cache(maxsize=64)
+def _read_header(path, mtime_ns):
+    """Read (frames, sample_rate, channels) from the file header; mtime_ns keys the cache."""
+    import soundfile as sf
+    info = sf.info(path)
+    return info.frames, info.samplerate, info.channels
+
+def quick_meta(path, st=None):
+    """
+    Get audio metadata without decoding the file.
+
+    Args:
+        path: Path to audio file
+        st: Optional os.stat() result for path, to avoid another stat call
+
+    Returns:
+        Tuple of (frames, sample_rate, channels, size_bytes)
+    """
+    if st is None:
+        st = os.stat(path)
+    frames, samplerate, channels = _read_header(str(path), st.st_mtime_ns)
+    return frames, samplerate, channels, st.st_size
+
+def load_audio(audio_file, size_bytes=None):
+    """
+    Load an audio file as 16-bit PCM (a quarter of the memory of soundfile's float64
+    default); click tracks are mixed on these samples directly.
+
+    Args:
+        audio_file: Path to audio file
+        size_bytes: Optional known file size, to avoid another stat call
+
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    # Imported on demand so the RNN worker processes never load libsndfile
+    import soundfile as sf
+
+    if size_bytes is None:
+        size_bytes = os.path.getsize(audio_file)
+    with sf.SoundFile(audio_file) as f:
+        if f.subtype in ('FLOAT', 'DOUBLE'):
+            # libsndfile does not rescale float samples read as int16 (they truncate to ~0),
+            # so decode as float and quantize with clipping
+            return to_pcm16(f.read(dtype='float32', always_2d=False)), f.samplerate
+        if size_bytes > LARGE_FILE_BYTES:
+            # Decode straight into one preallocated buffer via libsndfile's buffered I/O
+            shape = (f.frames, f.channels) if f.channels > 1 else (f.frames,)
+            return f.read(out=np.empty(shape, dtype=np.int16)), f.samplerate
+        return f.read(dtype='int16', always_2d=False), f.samplerate
+
+# Result markdown building blocks (parsed once; joined per request)
+PREVIEW_HEADER = "# 🎵 File Preview"
+PREVIEW_FOOTER = "💡 **Tip:** Select analysis options to extract features."
+MADMOM_MISSING = "# ❌ Error\n\n**Madmom not available.**\n\nInstall with: `uv add madmom`"
+RESULTS_HEADER = "# 🎵 Analysis Results"
+RESULTS_FOOTER = """
+---
+✅ **Analysis completed!**
+
+💡 **Tip:** Play audio outputs below to hear detected features.
+"""
+FILE_INFO_TEMPLATE = """
+## 📁 File Information
+- **Filename:** `{name}`
+- **{size_label}:** `{size_kb:.1f} KB`
+- **Duration:** `{duration:.2f}s` ({minutes:.1f} minutes)
+- **Sample Rate:** `{sr} Hz`
+- **Channels:** `{channels}`
+"""
+BEATS_TEMPLATE = """
+## 🥁 Beat Tracking
+- **BPM:** `{bpm:.1f}`
+- **Beat Interval Std Dev:** `{ibi_std_ms:.1f} ms`
+- **Total Beats:** `{total_beats}`
+- **Total Downbeats:** `{total_downbeats}`
+- **First Beat:** `{first:.2f}s`
+- **Last Beat:** `{last:.2f}s`
+"""
+ONSETS_TEMPLATE = """
+## 🎯 Onset Detection
+- **Total Onsets:** `{total_onsets}`
+- **Density:** `{density:.1f} onsets/second`
+- **First Onset:** `{first:.2f}s`
+- **Last Onset:** `{last:.2f}s`
+"""
+TEMPO_TEMPLATE = """
+## ⏱️ Tempo Estimation
+- **Primary Tempo:** `{primary_tempo:.1f} BPM`
+"""
+
+def analyze_audio(audio_file, analysis_options, preloaded=None):
     """
     EXAMPLE: Madmom-based audio analysis.
 
     **REPLACE THIS FUNCTION** with your own processing logic!
 
     Args:
-        audio_file: Path to audio file
+        audio_file: Path to audio file (only a display name when preloaded is given)
         analysis_options: List of selected analysis types
+        preloaded: Optional (audio, sample_rate, source_key) for audio already decoded
+            in memory (see analyze_url); skips reading audio_file
 
     Returns:
         Tuple of (result_markdown, audio_output_1, audio_output_2, audio_output_3)
@@ -216,157 +1003,109 @@ def analyze_audio(audio_file, analysis_options):
     if audio_file is None:
         return "❌ Please upload an audio file first.", None, None, None
 
-    if not MADMOM_AVAILABLE:
-        return "# ❌ Error\n\n**Madmom not available.**\n\nInstall with: `uv add madmom`", None, None, None
-
     try:
+        if preloaded is None:
+            # File information comes from the header, so it is available without decoding
+            # One stat per request: size, header cache and activation cache all derive from it
+            name = Path(audio_file).name
+            st = os.stat(audio_file)
+            frames, sr, channels, size_bytes = quick_meta(audio_file, st)
+            size_label = 'Size'
+        else:
+            audio, sr, source_key = preloaded
+            name = audio_file
+            frames = len(audio)
+            channels = 1 if audio.ndim == 1 else audio.shape[1]
+            size_bytes = audio.nbytes
+            size_label = 'Decoded Size'  # No file on disk; this is the in-memory PCM
+        file_size = size_bytes / 1024  # KB
+        duration = frames / sr
+
+        file_info = FILE_INFO_TEMPLATE.format_map({
+            'name': name,
+            'size_label': size_label,
+            'size_kb': file_size,
+            'duration': duration,
+            'minutes': duration / 60,
+            'sr': sr,
+            'channels': channels,
+        })
+
+        selected = [option for option in ANALYSIS_TASKS if option in (analysis_options or [])]
+        if not selected:
+            return "\n".join([PREVIEW_HEADER, file_info, PREVIEW_FOOTER]), None, None, None
+
+        if not load_madmom():
+            return MADMOM_MISSING, None, None, None
+
         # Load audio
-        audio, sr = sf.read(audio_file)
-        file_path = Path(audio_file)
-        file_size = file_path.stat().st_size / 1024  # KB
-        duration = len(audio) / sr
+        if preloaded is None:
+            audio, sr = load_audio(audio_file, size_bytes)
+            source_key = activation_source_key(audio_file, st.st_mtime_ns)
+
+        # The mono 44.1 kHz madmom input is built once for all options, and only if
+        # some activation still has to be computed
+        if all(activation_cache_path(ANALYSIS_ACTIVATIONS[option], source_key).exists()
+               for option in selected):
+            madmom_context = nullcontext(None)
+        else:
+            madmom_context = shared_array(prepare_madmom_input(audio, sr))
 
         results = {}
         audio_outputs = {}
 
-        # EXAMPLE 1: Beat Tracking
-        if "Beat Tracking" in analysis_options:
-            print("🥁 Running beat tracking...")
-            proc = DBNDownBeatTrackingProcessor(beats_per_bar=[3, 4], fps=100)
-            act = RNNDownBeatProcessor()(audio)
-            beat_result = proc(act)
-
-            beats = beat_result[:, 0]
-            downbeats = beat_result[beat_result[:, 1] == 1, 0]
-
-            # Calculate BPM
-            if len(beats) > 1:
-                bpm = 60 / np.mean(np.diff(beats))
-            else:
-                bpm = 0
-
-            results['beats'] = {
-                'beats': beats,
-                'downbeats': downbeats,
-                'bpm': bpm,
-                'total_beats': len(beats),
-                'total_downbeats': len(downbeats)
-            }
-
-            # Create audio with click tracks
-            click_track = librosa.clicks(times=beats, sr=sr, click_freq=800,
-                                        click_duration=0.1, length=len(audio))
-            downbeat_clicks = librosa.clicks(times=downbeats, sr=sr, click_freq=1200,
-                                           click_duration=0.15, length=len(audio))
-
-            # Handle stereo
-            if len(audio.shape) > 1 and audio.shape[1] == 2:
-                click_track = np.column_stack([click_track, click_track])
-                downbeat_clicks = np.column_stack([downbeat_clicks, downbeat_clicks])
-
-            # Mix audio + clicks
-            mixed_audio = audio + (click_track * 0.3) + (downbeat_clicks * 0.3)
-            if np.max(np.abs(mixed_audio)) > 0:
-                mixed_audio = mixed_audio / np.max(np.abs(mixed_audio)) * 0.8
-
-            # Save
-            timestamp = int(time.time())
-            beat_path = TEMP_DIR / f"beats_{timestamp}.wav"
-            sf.write(beat_path, mixed_audio, sr)
-            audio_outputs['beats'] = str(beat_path)
-
-        # EXAMPLE 2: Onset Detection
-        if "Onset Detection" in analysis_options:
-            print("🎯 Running onset detection...")
-            onset_proc = OnsetPeakPickingProcessor(threshold=0.5, fps=100)
-            onset_act = RNNOnsetProcessor()(audio)
-            onsets = onset_proc(onset_act)
-
-            results['onsets'] = {
-                'onset_times': onsets,
-                'total_onsets': len(onsets),
-            }
-
-            # Create audio with onset clicks
-            onset_clicks = librosa.clicks(times=onsets, sr=sr, click_freq=1500,
-                                         click_duration=0.08, length=len(audio))
-
-            if len(audio.shape) > 1 and audio.shape[1] == 2:
-                onset_clicks = np.column_stack([onset_clicks, onset_clicks])
-
-            mixed_onset = audio + (onset_clicks * 0.3)
-            if np.max(np.abs(mixed_onset)) > 0:
-                mixed_onset = mixed_onset / np.max(np.abs(mixed_onset)) * 0.8
-
-            timestamp = int(time.time())
-            onset_path = TEMP_DIR / f"onsets_{timestamp}.wav"
-            sf.write(onset_path, mixed_onset, sr)
-            audio_outputs['onsets'] = str(onset_path)
-
-        # EXAMPLE 3: Tempo Estimation
-        if "Tempo Estimation" in analysis_options:
-            print("⏱️ Running tempo estimation...")
-            tempo_proc = TempoEstimationProcessor(fps=100)
-            beat_proc = RNNBeatProcessor()(audio)
-            tempo_result = tempo_proc(beat_proc)
-
-            if len(tempo_result) > 0:
-                primary_tempo = tempo_result[0][0] if isinstance(tempo_result[0], (list, tuple, np.ndarray)) else tempo_result[0]
-                results['tempo'] = {
-                    'primary_tempo': float(primary_tempo),
-                }
-            else:
-                results['tempo'] = {'primary_tempo': 0.0}
+        # Allocate every int32 mix accumulator up front; tasks mix in place.
+        # Concurrent tasks cannot share one buffer, so each click-track option gets its own.
+        mix_buffers = {option: np.empty(audio.shape, dtype=np.int32)
+                       for option in selected if option in CLICK_TRACK_OPTIONS}
+
+        # Persisted copies are written on IO_POOL; the response does not wait for them
+        suffix = unique_suffix()
+
+        # Options are independent, so run them concurrently. Their RNN passes run on the
+        # worker process pool and read the madmom input from shared memory.
+        with madmom_context as madmom_input, \
+                ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            futures = [pool.submit(ANALYSIS_TASKS[option], audio, sr, madmom_input,
+                                   source_key, mix_buffers.get(option))
+                       for option in selected]
+            for future in as_completed(futures):
+                key, result, mixed = future.result()
+                results[key] = result
+                if mixed is not None:
+                    # Mixes are int16 already; Gradio encodes (sr, samples) tuples itself
+                    audio_outputs[key] = (sr, mixed)
+                    if PERSIST_OUTPUTS:
+                        output_path = TEMP_DIR / f"{key}_{suffix}.{OUTPUT_FORMAT}"
+                        IO_POOL.submit(save_pcm16, output_path, mixed, sr).add_done_callback(
+                            report_write_error)
 
         # Generate formatted results
-        result_text = f"""
-# 🎵 Analysis Results
-
-## 📁 File Information
-- **Filename:** `{file_path.name}`
-- **Size:** `{file_size:.1f} KB`
-- **Duration:** `{duration:.2f}s` ({duration/60:.1f} minutes)
-- **Sample Rate:** `{sr} Hz`
-
-"""
+        parts = [RESULTS_HEADER, file_info]
 
         if 'beats' in results:
             data = results['beats']
-            result_text += f"""
-## 🥁 Beat Tracking
-- **BPM:** `{data['bpm']:.1f}`
-- **Total Beats:** `{data['total_beats']}`
-- **Total Downbeats:** `{data['total_downbeats']}`
-- **First Beat:** `{data['beats'][0]:.2f}s`
-- **Last Beat:** `{data['beats'][-1]:.2f}s`
-
-"""
+            parts.append(BEATS_TEMPLATE.format_map({
+                **data,
+                'ibi_std_ms': data['ibi_std'] * 1000,
+                'first': data['beats'][0],
+                'last': data['beats'][-1],
+            }))
 
         if 'onsets' in results:
             data = results['onsets']
-            result_text += f"""
-## 🎯 Onset Detection
-- **Total Onsets:** `{data['total_onsets']}`
-- **Density:** `{data['total_onsets']/duration:.1f} onsets/second`
-- **First Onset:** `{data['onset_times'][0]:.2f}s`
-- **Last Onset:** `{data['onset_times'][-1]:.2f}s`
-
-"""
+            parts.append(ONSETS_TEMPLATE.format_map({
+                **data,
+                'density': data['total_onsets'] / duration,
+                'first': data['onset_times'][0],
+                'last': data['onset_times'][-1],
+            }))
 
         if 'tempo' in results:
-            data = results['tempo']
-            result_text += f"""
-## ⏱️ Tempo Estimation
-- **Primary Tempo:** `{data['primary_tempo']:.1f} BPM`
+            parts.append(TEMPO_TEMPLATE.format_map(results['tempo']))
 
-"""
-
-        result_text += """
----
-✅ **Analysis completed!**
-
-💡 **Tip:** Play audio outputs below to hear detected features.
-        """
+        parts.append(RESULTS_FOOTER)
+        result_text = "\n".join(parts)
 
         return (
             result_text,
@@ -381,10 +1120,47 @@ def analyze_audio(audio_file, analysis_options):
         print(f"Error during analysis:\n{error_details}")
         return f"# ❌ Error\n\n**Analysis failed:** `{str(e)}`\n\nCheck console for details.", None, None, None
 
+def analyze_url(youtube_url, analysis_options):
+    """
+    Analyze a YouTube URL directly, streaming its audio into memory.
+
+    Skips the WAV download/re-read round trip of "Download from YouTube"; only the
+    first URL is analyzed.
+
+    Args:
+        youtube_url: YouTube video URL(s)
+        analysis_options: List of selected analysis types
+
+    Returns:
+        Same as analyze_audio
+    """
+    urls = (youtube_url or "").split()
+    if not urls:
+        return "❌ Please enter a YouTube URL.", None, None, None
+
+    # Unlike a file, a stream has no header to preview, so check everything that
+    # would stop the analysis before downloading anything
+    if not any(option in ANALYSIS_TASKS for option in (analysis_options or [])):
+        return "❌ Please select at least one analysis option.", None, None, None
+    if not load_madmom():
+        return MADMOM_MISSING, None, None, None
+
+    url = urls[0]
+    print(f"📡 Streaming audio from {url}...")
+    try:
+        audio = stream_youtube_audio(url)
+    except Exception as e:
+        return f"# ❌ Error\n\n**Streaming failed:** `{str(e)}`", None, None, None
+
+    # Activations are cached per URL, as the video behind it does not change
+    return analyze_audio(url, analysis_options,
+                         preloaded=(audio, MADMOM_SAMPLE_RATE, f"url|{url}"))
+
 # === DEMO INTERFACE ===
 
 def create_demo():
     """Create the Gradio demo interface."""
+    import gradio as gr
 
     with gr.Blocks(
         title=APP_TITLE,
@@ -428,7 +1204,7 @@ def create_demo():
 
             with gr.Column(scale=1):
                 youtube_url = gr.Textbox(
-                    label="Or paste YouTube URL",
+                    label="Or paste YouTube URL (one per line for a batch)",
                     placeholder="https://youtube.com/watch?v=...",
                     lines=2
                 )
@@ -451,8 +1227,10 @@ def create_demo():
                     outputs=[audio_input]
                 )
 
-        # YouTube download button
-        yt_download_btn = gr.Button("📥 Download from YouTube", variant="secondary")
+        # YouTube buttons: download to the input, or analyze the stream without a file
+        with gr.Row():
+            yt_download_btn = gr.Button("📥 Download from YouTube", variant="secondary")
+            yt_analyze_btn = gr.Button("⚡ Analyze YouTube URL Directly", variant="secondary")
 
         # Configuration Options
         gr.Markdown("### ⚙️ Analysis Options")
@@ -482,28 +1260,20 @@ def create_demo():
         with gr.Row():
             audio_output_1 = gr.Audio(
                 label="Beats + Downbeats",
-                type="filepath"
+                type="numpy"
             )
             audio_output_2 = gr.Audio(
                 label="Onsets",
-                type="filepath"
+                type="numpy"
             )
             audio_output_3 = gr.Audio(
                 label="Additional Output",
-                type="filepath"
+                type="numpy"
             )
 
         # Help Section
         with gr.Accordion("ℹ️ Help", open=False):
-            gr.Markdown("""
-                **Features:**
-                - 🥁 **Beat Tracking:** Detects beats/downbeats and estimates BPM
-                - 🎯 **Onset Detection:** Identifies note onset events
-                - ⏱️ **Tempo Estimation:** Estimates primary tempo
-
-                **Supported:** WAV, MP3, FLAC, OGG, M4A, AAC
-                **Temp files:** Check $TEMP_DIR in .env
-            """)
+            gr.Markdown(HELP_TEXT)
 
         # Event Handlers
         yt_download_btn.click(
@@ -518,6 +1288,12 @@ def create_demo():
             outputs=[results_text, audio_output_1, audio_output_2, audio_output_3]
         )
 
+        yt_analyze_btn.click(
+            fn=analyze_url,
+            inputs=[youtube_url, analysis_options],
+            outputs=[results_text, audio_output_1, audio_output_2, audio_output_3]
+        )
+
     return demo
 
 # === PORT UTILITIES ===
@@ -526,17 +1302,36 @@ def is_port_available(port: int, host: str = "0.0.0.0") -> bool:
     """Check if a port is available."""
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Match the server's own socket options so TIME_WAIT ports count as free.
+            # POSIX only: on Windows SO_REUSEADDR also allows binding a port in active use.
+            if os.name != 'nt':
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind((host, port))
             return True
     except OSError:
         return False
 
 def find_available_port(start_port: int, host: str = "0.0.0.0", max_attempts: int = 100) -> int:
-    """Find an available port starting from start_port."""
-    for port in range(start_port, start_port + max_attempts):
-        if is_port_available(port, host):
-            return port
-    raise RuntimeError(f"Could not find an available port starting from {start_port}")
+    """
+    Find the lowest available port starting from start_port (probes run concurrently).
+
+    A start_port of 0 lets the OS pick a free port with a single bind.
+    """
+    if start_port == 0:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            if os.name != 'nt':
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((host, 0))
+            return s.getsockname()[1]
+
+    candidates = range(start_port, start_port + max_attempts)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        available = list(pool.map(lambda port: is_port_available(port, host), candidates))
+
+    port = next((p for p, ok in zip(candidates, available) if ok), None)
+    if port is None:
+        raise RuntimeError(f"Could not find an available port starting from {start_port}")
+    return port
 
 # === COMMAND-LINE ARGUMENTS ===
 
@@ -549,6 +1344,7 @@ def parse_args():
 Examples:
   python demo_template.py                          # Default: localhost:7860
   python demo_template.py --port 8080              # Custom port
+  python demo_template.py --port 0                 # Any free port (chosen by the OS)
   python demo_template.py --share                  # Public URL with Gradio share
   python demo_template.py --samples-dir ~/Music    # Custom samples directory
   python demo_template.py --cleanup-days 3         # Clean files older than 3 days
@@ -566,7 +1362,8 @@ Environment Variables:
         "--port",
         type=int,
         default=int(os.getenv("PORT", 7860)),
-        help="Port to run the server on (default: 7860 or $PORT). Must be >= 1024 (privileged ports require root)"
+        help="Port to run the server on (default: 7860 or $PORT). Must be >= 1024 "
+             "(privileged ports require root), or 0 for any free port"
     )
 
     parser.add_argument(
@@ -626,15 +1423,22 @@ def cleanup_old_files(directory: Path, days: int):
     deleted_count = 0
     deleted_size = 0
 
+    def walk(path):
+        # One stat per file: mtime and size come from the same DirEntry.stat() result
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
     try:
-        for file_path in directory.rglob('*'):
-            if file_path.is_file():
-                # Check file modification time
-                if file_path.stat().st_mtime < cutoff_time:
-                    file_size = file_path.stat().st_size
-                    file_path.unlink()
-                    deleted_count += 1
-                    deleted_size += file_size
+        for file_path, st in walk(directory):
+            # Check file modification time
+            if st.st_mtime < cutoff_time:
+                os.unlink(file_path)
+                deleted_count += 1
+                deleted_size += st.st_size
 
         if deleted_count > 0:
             print(f"🧹 Cleaned up {deleted_count} files ({deleted_size / 1024 / 1024:.2f} MB) older than {days} days")
@@ -648,7 +1452,6 @@ if __name__ == "__main__":
     args = parse_args()
 
     # Update SAMPLES_DIR from command-line argument
-    import sys
     current_module = sys.modules[__name__]
     current_module.SAMPLES_DIR = Path(args.samples_dir).resolve()
 
@@ -657,7 +1460,11 @@ if __name__ == "__main__":
     current_module.TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
     # Validate port number
-    if args.port < 1024:
+    if not 0 <= args.port <= 65535:
+        print(f"❌ Error: Port {args.port} is out of range (0-65535)")
+        print("💡 Use a port >= 1024, for example: --port 8080, or --port 0 for any free port")
+        exit(1)
+    if 0 < args.port < 1024:
         print(f"❌ Error: Port {args.port} is a privileged port (requires root)")
         print(f"💡 Use a port >= 1024, for example: --port 8080")
         print(f"   Or run with sudo if you need to use port {args.port}")
@@ -665,7 +1472,10 @@ if __name__ == "__main__":
 
     # Handle port conflicts
     original_port = args.port
-    if args.auto_port or not is_port_available(args.port, args.host):
+    if args.port == 0:
+        args.port = find_available_port(0, args.host)
+        print(f"✅ OS assigned port: {args.port}")
+    elif args.auto_port or not is_port_available(args.port, args.host):
         if not args.auto_port:
             print(f"⚠️ Port {args.port} is already in use!")
             print("💡 Tip: Use --auto-port flag to automatically find an available port")
@@ -703,10 +1513,15 @@ if __name__ == "__main__":
     else:
         print("🌍 Share: Disabled (local only)")
 
-    if not MADMOM_AVAILABLE:
+    # find_spec checks installation without importing madmom
+    if importlib.util.find_spec("madmom") is None:
         print("\n⚠️ Warning: Madmom not available")
         print("   Install with: uv add madmom")
         print("   Or replace with your own audio library\n")
+    else:
+        # Load the models while the UI starts instead of on the first request
+        warm_up_rnn_pool()
+    warm_up_kernels()
 
     # Configure allowed paths for file serving (CRITICAL for --share and public URLs)
     allowed_paths = [